@@ -1,13 +1,12 @@
 import asyncio
 import datetime
 import random
-import re
 
 import aiohttp
 from aiohttp_socks import ProxyConnector
 
 from models.settings import load_settings
-from models.v2ray_config import CONFIG_PATTERN
+from models.v2ray_config import CONFIG_RE
 from services.read_channels import read_channels
 from services.telegram_web_scraping import (
     get_message_datetime,
@@ -66,11 +65,10 @@ async def check_channel(
                     return None
 
                 msg_text = get_message_text(msg)
-                if msg_text:
-                    found = re.findall(CONFIG_PATTERN, msg_text)
-                    if found:
-                        print(f"✓ {channel:<30}")
-                        return channel
+                # Cheap C-level reject: most messages carry no links at all
+                if msg_text and "://" in msg_text and CONFIG_RE.search(msg_text):
+                    print(f"✓ {channel:<30}")
+                    return channel
 
             last_msg_datetime = None
             next_offset_id = None
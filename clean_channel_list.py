@@ -11,22 +11,18 @@ def clean(channels_file: str, output_file: str):
         raw_count = len(channels)
         print(f"   • Raw entries found: {raw_count}")
 
-        channels = [ch.lower() for ch in channels]
-        channels_set = set(channels)
-        unique_count = len(channels_set)
+        # One generator pass: lowercase, dedup (dict built in C), then sort
+        channels = sorted(dict.fromkeys(ch.lower() for ch in channels))
+        unique_count = len(channels)
         duplicates_removed = raw_count - unique_count
 
-        channels = list(channels_set)
-        channels.sort()
-
         print(f"   • Duplicates removed: {duplicates_removed}")
         print(f"   • Unique channels:    {unique_count}")
 
         # Save
         print(f"Saving to: {output_file}")
         with open(output_file, "w", encoding="utf-8") as f:
-            for channel in channels:
-                f.write(channel + "\n")
+            f.write("\n".join(channels) + "\n")
 
         print("\nSuccess! List cleaned and sorted.")
     else:
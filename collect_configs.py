@@ -1,13 +1,12 @@
 import asyncio
 import datetime
 import random
-import re
 
 import aiohttp
 from aiohttp_socks import ProxyConnector
 
 from models.settings import load_settings
-from models.v2ray_config import CONFIG_PATTERN
+from models.v2ray_config import CONFIG_RE
 from services import renamer
 from services.read_channels import read_channels
 from services.telegram_web_scraping import (
@@ -64,10 +63,10 @@ async def collect_channel_configs(
                     return channel_configs
 
                 msg_text = get_message_text(msg)
-                if msg_text:
-                    found = re.findall(CONFIG_PATTERN, msg_text)
-                    for config in found:
-                        config = config.rstrip(".:,;!?")
+                # Cheap C-level reject: most messages carry no links at all
+                if msg_text and "://" in msg_text:
+                    for match in CONFIG_RE.finditer(msg_text):
+                        config = match.group(0).rstrip(".:,;!?")
 
                         renamed_config = renamer.rename_config(config, channel)
                         channel_configs.add(str(renamed_config))
@@ -133,8 +132,7 @@ async def collect_all_channels_configs(
                 channels_with_configs += 1
 
                 with open(output_file, "a", encoding="utf-8") as f:
-                    for config in result:
-                        f.write(config + "\n")
+                    f.write("\n".join(result) + "\n")
 
     print("\nCollection Complete!")
     print(f"   • Channels with configs: {channels_with_configs}")
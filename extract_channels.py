@@ -170,8 +170,7 @@ async def extract_all_channels_links(
                 channels_with_configs += 1
 
                 with open(output_file, "a", encoding="utf-8") as f:
-                    for config in result:
-                        f.write(config + "\n")
+                    f.write("\n".join(result) + "\n")
 
     print("\nExtraction Complete!")
     print(f"   • Channels with channel links: {channels_with_configs}")
@@ -1,7 +1,10 @@
-from pydantic import BaseModel, ValidationError
+import os
+from functools import lru_cache
 
+import msgspec
 
-class Settings(BaseModel):
+
+class Settings(msgspec.Struct):
     PROXY_URL: str
     MAX_CONCURRENT_SCANS: int
     MAX_PAGES: int
@@ -9,16 +12,27 @@ class Settings(BaseModel):
     BASE_PORT: int
     TEST_URL: str
     TIMEOUT: int
-    BATCH_SIZE: int  # Pydantic will auto-convert "500" -> 500
+    BATCH_SIZE: int  # strict=False below auto-converts "500" -> 500
     MAX_WORKERS: int
     MAX_RETRIES: int
 
 
-def load_settings(file_path: str):
+# Schema-driven C-level decoding, much faster than validating dicts in Python
+_decoder = msgspec.json.Decoder(Settings, strict=False)
+
+
+@lru_cache(maxsize=8)
+def _load(file_path: str, mtime: float):
     try:
-        with open(file_path, "r") as f:
-            # .model_validate_json() handles the casting and validation
-            return Settings.model_validate_json(f.read())
-    except ValidationError as e:
+        with open(file_path, "rb") as f:
+            return _decoder.decode(f.read())
+    except msgspec.DecodeError as e:
+        # Covers malformed JSON and schema validation failures
         print(f"Configuration Error: {e}")
         raise
+
+
+def load_settings(file_path: str):
+    # mtime in the cache key invalidates automatically when the file changes,
+    # so the JSON is only re-validated after an actual edit
+    return _load(file_path, os.path.getmtime(file_path))
@@ -1,12 +1,23 @@
+import re
+from dataclasses import dataclass
 from typing import Any
 
 CONFIG_PATTERN = r"(?:vmess|vless|trojan|ss|tuic|hysteria2?)://[a-zA-Z0-9\-_@.:?=&%#]+"
 
+# google-re2 compiles the alternation into a DFA (no backtracking), which is
+# much faster on long message bodies. It is optional: stdlib re is the fallback.
+try:
+    import re2 as _re_engine  # type: ignore
+except ImportError:
+    _re_engine = re
 
+# Compiled once at import time so the per-message scan skips the re cache lookup
+CONFIG_RE = _re_engine.compile(CONFIG_PATTERN)
+
+
+# slots=True drops the per-instance __dict__; thousands of these are
+# allocated when parsing a big config file
+@dataclass(slots=True)
 class V2rayConfig:
     link: str
     parsed_data: dict[str, Any]
-
-    def __init__(self, link: str, parsed_data: dict[str, Any]) -> None:
-        self.link = link
-        self.parsed_data = parsed_data
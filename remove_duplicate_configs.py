@@ -1,19 +1,37 @@
+from concurrent.futures import ProcessPoolExecutor
+
 from services import fingerprint
 from services.read_configs import read_configs
 
+# Below this size the fork/IPC cost of a pool outweighs the parallelism
+PARALLEL_THRESHOLD = 5000
+
+
+def generate_fingerprints(configs: list[str]):
+    """Fingerprints all configs, fanning out to a process pool on big lists."""
+    if len(configs) < PARALLEL_THRESHOLD:
+        return [fingerprint.generate_fingerprint(config) for config in configs]
+
+    with ProcessPoolExecutor() as executor:
+        return list(
+            executor.map(fingerprint.generate_fingerprint, configs, chunksize=1024)
+        )
+
 
 def remove_duplicates(configs: list[str]):
-    unique_configs = {}
+    seen_fingerprints = set()
+    unique_configs = []
 
-    for config in configs:
-        fgp = fingerprint.generate_fingerprint(config)
+    fingerprints = generate_fingerprints(configs)
 
+    for config, fgp in zip(configs, fingerprints):
         if not fgp:
             continue  # Skip invalid configs
 
-        # Check if this ID exists in our database
-        if fgp not in unique_configs:
-            unique_configs[fgp] = config
+        # One hash probe per config; keeps first-seen order
+        if fgp not in seen_fingerprints:
+            seen_fingerprints.add(fgp)
+            unique_configs.append(config)
 
     # Calculate stats
     initial_count = len(configs)
@@ -24,15 +42,17 @@ def remove_duplicates(configs: list[str]):
         f"➤ Deduplication Report: Processed {initial_count} configs. Kept {unique_count} unique. Removed {duplicates_count} duplicates."
     )
 
-    return list(unique_configs.values())
+    return unique_configs
 
 
 def run(configs_file: str, output_file: str):
     configs = read_configs(configs_file)
     unique_configs = remove_duplicates(configs)
 
-    with open(output_file, "w", encoding="utf-8") as f:
-        for config in unique_configs:
-            f.write(config + "\n")
+    # Encode the whole payload once and hand it to the kernel in one write,
+    # skipping the text-layer encode/flush machinery
+    buf = ("\n".join(unique_configs) + "\n").encode("utf-8") if unique_configs else b""
+    with open(output_file, "wb") as f:
+        f.write(buf)
 
     print(f"saved to {output_file}")
@@ -1,20 +1,44 @@
 import base64
+import binascii
 import json
 import urllib.parse
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# orjson is a C extension, 2-5x faster than stdlib json on small payloads
+json_loads = orjson.loads if orjson is not None else json.loads
+
 
 def safe_base64_decode(s):
     """Safely decodes base64 strings with missing padding."""
-    s = s.strip()
-    missing_padding = len(s) % 4
-    if missing_padding:
-        s += "=" * (4 - missing_padding)
+    b = s.strip().encode("ascii", "ignore")
+    b += b"=" * ((-len(b)) & 3)
     try:
-        return base64.urlsafe_b64decode(s).decode("utf-8", errors="ignore")
-    except Exception:
+        return base64.urlsafe_b64decode(b).decode("utf-8", errors="ignore")
+    except (binascii.Error, ValueError):
         return ""
 
 
+def vmess_fingerprint_from_data(data):
+    """Builds the vmess signature from already-parsed VMess JSON."""
+    # We assume if IP, Port, ID, and Network match, it's the same server.
+    # 'add' = address, 'id' = uuid
+    get = data.get
+    return (
+        f"vmess|"
+        f"{get('add', '').lower()}|"
+        f"{get('port', '')}|"
+        f"{get('id', '')}|"
+        f"{get('net', '')}|"
+        f"{get('path', '')}|"
+        f"{get('host', '')}|"
+        f"{get('sni', '')}"
+    )
+
+
 def get_vmess_fingerprint(link):
     """
     Parses VMess JSON and creates a unique signature.
@@ -22,59 +46,68 @@ def get_vmess_fingerprint(link):
     """
     try:
         # 1. Remove prefix and decode
-        payload = link.replace("vmess://", "")
+        payload = link[len("vmess://") :]
         decoded = safe_base64_decode(payload)
         if not decoded:
             return None
 
-        data = json.loads(decoded)
+        data = json_loads(decoded)
 
         # 2. Extract functional fields only
-        # We assume if IP, Port, ID, and Network match, it's the same server.
-        # 'add' = address, 'id' = uuid
-        fingerprint = (
-            f"vmess|"
-            f"{data.get('add', '').lower()}|"
-            f"{data.get('port', '')}|"
-            f"{data.get('id', '')}|"
-            f"{data.get('net', '')}|"
-            f"{data.get('path', '')}|"
-            f"{data.get('host', '')}|"
-            f"{data.get('sni', '')}"
-        )
-        return fingerprint
+        return vmess_fingerprint_from_data(data)
     except Exception:
         return None  # If we can't parse it, treat it as invalid or unique
 
 
+# The only query params that matter for uniqueness
+RELEVANT_PARAMS = frozenset(["security", "sni", "host", "type", "serviceName", "path"])
+
+
 def get_url_fingerprint(link):
     """
     Parses standard URI schemes (VLESS, Trojan, Tuic, Hysteria).
     Ignores the fragment (#remark).
+
+    Splits the link by hand instead of urlparse + parse_qs: we only need
+    scheme, host, port, user, and a handful of query keys, so the full
+    percent-decode of every param is wasted work in the dedup hot path.
     """
     try:
-        parsed = urllib.parse.urlparse(link)
-
-        # Parse query params to sort them (to ensure order doesn't matter)
-        query = urllib.parse.parse_qs(parsed.query)
-
-        # Extract critical params for uniqueness
-        # We care about: security, sni, type, serviceName, path, host
-        relevant_params = []
-        for key in ["security", "sni", "host", "type", "serviceName", "path"]:
-            val = query.get(key, [""])[0]
-            if val:
-                relevant_params.append(f"{key}={val}")
-
-        params_str = "|".join(sorted(relevant_params))
-
-        fingerprint = (
-            f"{parsed.scheme}|"
-            f"{parsed.hostname.lower()}|"
-            f"{parsed.port}|"
-            f"{parsed.username}|"
-            f"{params_str}"
+        scheme, _, rest = link.partition("://")
+
+        rest = rest.partition("#")[0]  # Drop the fragment (remark)
+        netloc, _, query = rest.partition("?")
+        netloc = netloc.partition("/")[0]
+
+        userinfo, at_sep, hostport = netloc.rpartition("@")
+        username = userinfo.partition(":")[0] if at_sep else None
+
+        host, colon_sep, port_str = hostport.rpartition(":")
+        if colon_sep and port_str.isdigit():
+            port = int(port_str)
+        else:
+            host = hostport
+            port = None
+
+        # Strip IPv6 brackets (e.g. [::1] -> ::1)
+        if host.startswith("[") and host.endswith("]"):
+            host = host[1:-1]
+
+        if not host:
+            return None
+
+        relevant_params = {}
+        if query:
+            for kv in query.split("&"):
+                key, _, val = kv.partition("=")
+                if val and key in RELEVANT_PARAMS and key not in relevant_params:
+                    relevant_params[key] = urllib.parse.unquote(val)
+
+        params_str = "|".join(
+            sorted(f"{key}={val}" for key, val in relevant_params.items())
         )
+
+        fingerprint = f"{scheme}|{host.lower()}|{port}|{username}|{params_str}"
         return fingerprint
     except Exception:
         return None
@@ -85,11 +118,8 @@ def get_ss_fingerprint(link):
     Parses Shadowsocks (SS) links.
     """
     try:
-        # Remove ss://
-        body = link.split("ss://")[1]
-        # Remove remark (#...)
-        if "#" in body:
-            body = body.split("#")[0]
+        # Remove ss:// and the remark (#...)
+        body = link[len("ss://") :].partition("#")[0]
 
         # SS links can be base64 encoded or plain text
         if "@" not in body:
@@ -104,16 +134,27 @@ def get_ss_fingerprint(link):
         return None
 
 
+_FINGERPRINT_DISPATCH = {
+    "vmess": get_vmess_fingerprint,
+    "ss": get_ss_fingerprint,
+    "vless": get_url_fingerprint,
+    "trojan": get_url_fingerprint,
+    "tuic": get_url_fingerprint,
+    "hysteria": get_url_fingerprint,
+    "hysteria2": get_url_fingerprint,
+}
+
+
 def generate_fingerprint(config):
     """
     Main router function to handle different protocols.
+    Dispatches on the scheme with one dict lookup instead of
+    a chain of startswith checks.
     """
-    if config.startswith("vmess://"):
-        return get_vmess_fingerprint(config)
-    elif config.startswith("ss://"):
-        return get_ss_fingerprint(config)
-    elif config.startswith(("vless://", "trojan://", "tuic://", "hysteria")):
-        return get_url_fingerprint(config)
+    scheme = config.partition("://")[0]
+    handler = _FINGERPRINT_DISPATCH.get(scheme)
+    if handler:
+        return handler(config)
 
     # Fallback: if we don't know the protocol, just use the link itself
     return config
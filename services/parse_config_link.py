@@ -1,22 +1,29 @@
 import base64
+import binascii
 import json
 from urllib.parse import parse_qs, unquote, urlparse
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# orjson is a C extension, 2-5x faster than stdlib json on small payloads
+json_loads = orjson.loads if orjson is not None else json.loads
+
 
 def safe_base64_decode(s):
     """Helper to decode base64 strings with or without padding."""
     if not s:
         return ""
-    s = s.strip()
-    padding = 4 - (len(s) % 4)
-    if padding != 4:
-        s += "=" * padding
+    b = s.strip().encode("ascii", "ignore")
+    b += b"=" * ((-len(b)) & 3)
     try:
-        return base64.urlsafe_b64decode(s).decode("utf-8")
-    except Exception:
+        return base64.urlsafe_b64decode(b).decode("utf-8")
+    except (binascii.Error, ValueError, UnicodeDecodeError):
         try:
-            return base64.b64decode(s).decode("utf-8")
-        except Exception:
+            return base64.b64decode(b).decode("utf-8")
+        except (binascii.Error, ValueError, UnicodeDecodeError):
             return ""
 
 
@@ -24,7 +31,7 @@ def parse_vmess(link):
     """Parses VMess (base64 encoded JSON)."""
     b64_str = link[8:]
     try:
-        data = json.loads(safe_base64_decode(b64_str))
+        data = json_loads(safe_base64_decode(b64_str))
     except Exception:
         raise ValueError("Invalid VMess base64")
 
@@ -84,7 +91,7 @@ def parse_server_host_port(server_str):
         raise ValueError(f"Invalid server format: {server_str}")
 
 
-VALID_SS_METHODS = {
+VALID_SS_METHODS = frozenset({
     # AEAD
     "aes-128-gcm",
     "aes-192-gcm",
@@ -105,7 +112,7 @@ VALID_SS_METHODS = {
     "chacha20-ietf",
     "xchacha20",
     "chacha20",
-}
+})
 
 
 def parse_shadowsocks(link):
@@ -125,14 +132,14 @@ def parse_shadowsocks(link):
 
     # 1. Extract Tag (Fragment)
     tag = "ss-proxy"
-    if "#" in uri:
-        uri, tag_raw = uri.split("#", 1)
+    uri, hash_sep, tag_raw = uri.partition("#")
+    if hash_sep:
         tag = unquote(tag_raw).strip()
 
     # 2. Extract Plugins (Query) - SIP002 feature
     plugin_opts = None
-    if "?" in uri:
-        uri, query_part = uri.split("?", 1)
+    uri, query_sep, query_part = uri.partition("?")
+    if query_sep:
         # We store plugins but Sing-box support varies, so we mostly extract
         # to clean the URI for the next steps.
         q_params = parse_qs(query_part)
@@ -287,20 +294,28 @@ def parse_standard_uri(link, protocol):
     return outbound
 
 
+_SCHEME_PROTOCOLS = {
+    "vless": "vless",
+    "trojan": "trojan",
+    "tuic": "tuic",
+    "hysteria2": "hysteria2",
+    "hy2": "hysteria2",
+}
+
+
 def parse_link(link):
     link = link.strip()
-    if link.startswith("vmess://"):
+    scheme = link.partition("://")[0]
+
+    if scheme == "vmess":
         return parse_vmess(link)
-    if link.startswith("ss://"):
+    if scheme == "ss":
         return parse_shadowsocks(link)
-    if link.startswith("vless://"):
-        return parse_standard_uri(link, "vless")
-    if link.startswith("trojan://"):
-        return parse_standard_uri(link, "trojan")
-    if link.startswith("tuic://"):
-        return parse_standard_uri(link, "tuic")
-    if "hysteria2" in link or "hy2://" in link:
-        return parse_standard_uri(link, "hysteria2")
+
+    protocol = _SCHEME_PROTOCOLS.get(scheme)
+    if protocol:
+        return parse_standard_uri(link, protocol)
+
     raise ValueError("Unsupported protocol")
 
 
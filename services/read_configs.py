@@ -1,9 +1,19 @@
+import mmap
+
+
 def read_configs(file_path: str):
     try:
-        with open(file_path, "r", encoding="utf-8") as f:
-            configs = f.read().split("\n")
-
-            return configs[:-1]
+        with open(file_path, "rb") as f:
+            try:
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                    # splitlines handles any EOL style and a missing trailing
+                    # newline, so the last config is never dropped
+                    return [
+                        line.decode("utf-8") for line in mm.read().splitlines() if line
+                    ]
+            except ValueError:
+                # Empty files cannot be mmapped
+                return []
     except FileNotFoundError:
         print(f"[!] Error: {file_path} not found.")
         raise
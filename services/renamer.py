@@ -1,15 +1,30 @@
 import base64
 import json
+import re
 import urllib.parse
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# orjson is a C extension, 2-5x faster than stdlib json on small payloads
+json_loads = orjson.loads if orjson is not None else json.loads
+
+if orjson is not None:
+
+    def json_dumps(obj):
+        return orjson.dumps(obj).decode("utf-8")
+
+else:
+    json_dumps = json.dumps
+
 
 def safe_base64_decode(s):
     """Helper to decode base64 strings with missing padding."""
-    s = s.strip()
-    missing_padding = len(s) % 4
-    if missing_padding:
-        s += "=" * (4 - missing_padding)
-    return base64.urlsafe_b64decode(s).decode("utf-8", errors="ignore")
+    b = s.strip().encode("ascii", "ignore")
+    b += b"=" * ((-len(b)) & 3)
+    return base64.urlsafe_b64decode(b).decode("utf-8", errors="ignore")
 
 
 def safe_base64_encode(s):
@@ -17,23 +32,54 @@ def safe_base64_encode(s):
     return base64.urlsafe_b64encode(s.encode("utf-8")).decode("utf-8").rstrip("=")
 
 
+_PS_RE = re.compile(r'("ps"\s*:\s*")([^"\\]*)(")')
+
+
+def patch_vmess_ps(decoded_json, channel_name):
+    """
+    Patches the 'ps' remark inside decoded VMess JSON without reserializing.
+    Returns the re-encoded link, or None when the field can't be patched
+    in place (missing, or contains escapes).
+    """
+    # json.dumps gives us a JSON-safe escape of the channel name
+    escaped_name = json.dumps(channel_name)[1:-1]
+
+    new_json, n = _PS_RE.subn(
+        lambda m: f"{m.group(1)}{escaped_name} | {m.group(2)}{m.group(3)}",
+        decoded_json,
+        count=1,
+    )
+    if n == 1:
+        return f"vmess://{safe_base64_encode(new_json)}"
+
+    return None
+
+
+def rename_vmess_data(data, channel_name):
+    """Updates the 'ps' field of already-parsed VMess JSON and re-encodes it."""
+    # Get current name and prepend channel
+    current_name = data.get("ps", "Server")
+    data["ps"] = f"{channel_name} | {current_name}"
+
+    # Re-encode
+    new_payload = json_dumps(data)
+    encoded_payload = safe_base64_encode(new_payload)
+    return f"vmess://{encoded_payload}"
+
+
 def rename_vmess(link, channel_name):
     """Parses VMess, updates the 'ps' field, and re-encodes it."""
     try:
-        payload = link.replace("vmess://", "")
+        payload = link[len("vmess://") :]
         decoded_json = safe_base64_decode(payload)
-        data = json.loads(decoded_json)
-
-        # Get current name and prepend channel
-        current_name = data.get("ps", "Server")
-        new_name = f"{channel_name} | {current_name}"
 
-        data["ps"] = new_name
+        # Fast path: patch only the remark, skipping the full JSON round-trip
+        patched = patch_vmess_ps(decoded_json, channel_name)
+        if patched:
+            return patched
 
-        # Re-encode
-        new_payload = json.dumps(data)
-        encoded_payload = safe_base64_encode(new_payload)
-        return f"vmess://{encoded_payload}"
+        data = json_loads(decoded_json)
+        return rename_vmess_data(data, channel_name)
     except Exception:
         return link  # If fails, return original
 
@@ -58,10 +104,14 @@ def rename_url_config(link, channel_name):
         return link
 
 
+def clean_channel_name(channel_name):
+    """Cleans up the channel name (remove @ or http)."""
+    return str(channel_name).split("/")[-1].replace("@", "").strip()
+
+
 def rename_config(link, channel_name):
     """Main entry point to rename any config."""
-    # Clean up the channel name (remove @ or http)
-    clean_name = str(channel_name).split("/")[-1].replace("@", "").strip()
+    clean_name = clean_channel_name(channel_name)
 
     if link.startswith("vmess://"):
         return rename_vmess(link, clean_name)
@@ -3,11 +3,12 @@ import os
 import random
 import re
 
+import entity_cache
 import socks
 from dotenv import load_dotenv
 from telethon import TelegramClient, errors
 
-from services import fingerprint, parse_date, read_channels, renamer
+from services import parse_once, parse_date, read_channels
 
 load_dotenv()
 
@@ -27,6 +28,7 @@ client = TelegramClient(SESSION_NAME, API_ID, API_HASH, proxy=PROXY_CONF)
 
 
 CONFIG_PATTERN = r"(?:vmess|vless|trojan|ss|tuic|hysteria2?)://[a-zA-Z0-9\-_@.:?=&%#]+"
+CONFIG_RE = re.compile(CONFIG_PATTERN)
 MAX_CONCURRENT_SCANS = 5
 
 
@@ -41,20 +43,27 @@ async def scan_channels(
         delay = random.uniform(1.5, 4.5)
         await asyncio.sleep(delay)
 
-        channel_configs = set()
+        # 64-bit fingerprint hash -> renamed link; one decode computes both,
+        # and the int keys are cheaper to store and probe than fingerprint strings
+        channel_configs: dict[int, str] = {}
 
         try:
-            entity = await client.get_input_entity(channel)
+            entity = await entity_cache.get_entity(client, channel)
 
-            async for message in client.iter_messages(entity, offset_date=end_date):
+            async for message in client.iter_messages(
+                entity, offset_date=end_date, limit=None, wait_time=0
+            ):
                 if message.date < start_date:
                     break
 
-                if message.text:
-                    found = re.findall(CONFIG_PATTERN, message.text)
-                    for config in found:
-                        renamed_config = renamer.rename_config(config, channel)
-                        channel_configs.add(renamed_config)
+                text = message.text
+                # Cheap C-level reject: most messages carry no links at all
+                if text and "://" in text:
+                    for match in CONFIG_RE.finditer(text):
+                        processed = parse_once.process(match.group(0), channel)
+                        if processed:
+                            fgp, renamed_config = processed
+                            channel_configs.setdefault(hash(fgp), renamed_config)
 
             count = len(channel_configs)
             if count > 0:
@@ -78,7 +87,7 @@ async def scan_channels(
         except Exception as e:
             error_msg = str(e).split("(")[0]  # Shorten error message
             print(f"✗ {channel:<30} | Error: {error_msg}")
-            return set()
+            return {}
 
 
 async def collect(start_time_str: str, end_time_str: str):
@@ -96,39 +105,25 @@ async def collect(start_time_str: str, end_time_str: str):
             task = scan_channels(client, channel, start_date, end_date, sem)
             tasks.append(task)
 
-        results = await asyncio.gather(*tasks)
+        results = await asyncio.gather(*tasks, return_exceptions=True)
 
-        collected_configs = set()
-        for channel_result in results:
-            collected_configs.update(channel_result)
-
-        print(f"\nScanning complete! Found {len(collected_configs)} configs.")
-        return list(collected_configs)
-
-
-def remove_duplicates(configs: list[str]):
-    unique_configs = {}
-
-    for config in configs:
-        fgp = fingerprint.generate_fingerprint(config)
+        entity_cache.save()
 
-        if not fgp:
-            continue  # Skip invalid configs
-
-        # Check if this ID exists in our database
-        if fgp not in unique_configs:
-            unique_configs[fgp] = config
-
-    # Calculate stats
-    initial_count = len(configs)
-    unique_count = len(unique_configs)
-    duplicates_count = initial_count - unique_count
-
-    print(
-        f"➤ Deduplication Report: Processed {initial_count} configs. Kept {unique_count} unique. Removed {duplicates_count} duplicates."
-    )
+        # Dedup across channels by fingerprint hash, first-seen wins.
+        # SoA layout: a set of int hashes plus a flat list of links keeps the
+        # store compact and makes the per-channel merge a set difference.
+        collected_hashes: set[int] = set()
+        collected_links: list[str] = []
+        for channel_result in results:
+            if isinstance(channel_result, Exception):
+                continue
+            if channel_result:
+                new_hashes = channel_result.keys() - collected_hashes
+                collected_hashes |= new_hashes
+                collected_links.extend(channel_result[h] for h in new_hashes)
 
-    return list(unique_configs.values())
+        print(f"\nScanning complete! Found {len(collected_links)} unique configs.")
+        return collected_links
 
 
 async def main():
@@ -136,13 +131,10 @@ async def main():
     start_str = input("start time: ")
     end_str = input("end time: ")
 
-    configs = await collect(start_str, end_str)
-
-    clean_configs = remove_duplicates(configs)
+    clean_configs = await collect(start_str, end_str)
 
     with open("configs.txt", "w", encoding="utf-8") as f:
-        for config in clean_configs:
-            f.write(config + "\n")
+        f.write("\n".join(clean_configs) + "\n")
 
     print("saved to configs.txt")
 
@@ -0,0 +1,42 @@
+import json
+
+from telethon import TelegramClient
+from telethon.tl.types import InputPeerChannel
+
+CACHE_FILE = "./entities.json"
+
+
+def _load_cache() -> dict:
+    try:
+        with open(CACHE_FILE, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+
+
+_cache = _load_cache()
+
+
+async def get_entity(client: TelegramClient, channel: str):
+    """
+    Resolves a channel to an input entity.
+
+    The (channel_id, access_hash) pair is persisted to entities.json, so
+    repeat runs skip the ResolveUsername RPC (one round-trip per channel).
+    """
+    cached = _cache.get(channel)
+    if cached:
+        return InputPeerChannel(cached[0], cached[1])
+
+    entity = await client.get_input_entity(channel)
+
+    if isinstance(entity, InputPeerChannel):
+        _cache[channel] = [entity.channel_id, entity.access_hash]
+
+    return entity
+
+
+def save():
+    """Writes the cache back to disk. Call once at the end of a run."""
+    with open(CACHE_FILE, "w", encoding="utf-8") as f:
+        json.dump(_cache, f)